@@ -1,10 +1,17 @@
+import hashlib
+import io
 import os
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
 import bibtexparser
 from bibtexparser.bparser import BibTexParser
+from bibtexparser.bibdatabase import BibDatabase
+from bibtexparser.bwriter import BibTexWriter
 from bibtexparser.customization import homogenize_latex_encoding
 from tkinter import Tk, filedialog
 import re
+from concurrent.futures import ThreadPoolExecutor
 
 # Disable root Tk window
 Tk().withdraw()
@@ -16,7 +23,8 @@ if not folder_path:
     exit()
 
 # Get all file paths
-all_files = [os.path.join(folder_path, f) for f in os.listdir(folder_path) if os.path.isfile(os.path.join(folder_path, f))]
+with os.scandir(folder_path) as it:
+    all_files = [entry.path for entry in it if entry.is_file()]
 
 # Determine file type
 csv_files = [f for f in all_files if f.lower().endswith(".csv")]
@@ -32,105 +40,170 @@ elif not csv_files and not bib_files:
 
 REQUIRED_FIELDS = ['title', 'author', 'publication', 'doi', 'url']
 
+REQUIRED_SET = set(REQUIRED_FIELDS)
+
 def normalize_columns(df):
-    column_mapping = {}
-    for col in df.columns:
-        cleaned = col.lower().replace(" ", "")
-        for required in REQUIRED_FIELDS:
-            if cleaned == required:
-                column_mapping[col] = required
-    return df.rename(columns=column_mapping)
+    cleaned = {col: col.lower().replace(" ", "") for col in df.columns}
+    return df.rename(columns={col: name for col, name in cleaned.items() if name in REQUIRED_SET})
+
+_collapse_whitespace = re.compile(r'\s+').sub
 
 def normalize_text(text):
-    return re.sub(r'\s+', ' ', str(text).lower().strip())
+    # Most values are already strings; only fall back to isna/str() for the rest
+    if not isinstance(text, str):
+        if pd.isna(text):
+            return ''
+        text = str(text)
+    return _collapse_whitespace(' ', text.casefold().strip())
+
+# Prefer the compiled make_key from fastnorm.pyx, built on first import when Cython is installed
+try:
+    import pyximport
+    pyximport.install(language_level=3)
+    from fastnorm import make_key
+except ImportError:
+    def make_key(title, author, publication, doi, url):
+        doi = normalize_text(doi)
+        # A DOI identifies the work on its own, so skip the other fields
+        if doi:
+            return ('doi', doi)
+        return (
+            'fields',
+            normalize_text(title),
+            normalize_text(author),
+            normalize_text(publication),
+            normalize_text(url)
+        )
 
 def get_unique_key(entry, use_only_doi=False):
     if use_only_doi:
         return normalize_text(entry.get('doi', ''))
-    return (
-        normalize_text(entry.get('title', '')),
-        normalize_text(entry.get('author', '')),
-        normalize_text(entry.get('publication', '')),
-        normalize_text(entry.get('doi', '')),
-        normalize_text(entry.get('url', ''))
+    return make_key(
+        entry.get('title', ''),
+        entry.get('author', ''),
+        entry.get('publication', ''),
+        entry.get('doi', ''),
+        entry.get('url', '')
     )
 
-unique_entries = {}
+def get_unique_keys(df):
+    """Column-wise get_unique_key: one key string per row of a DataFrame"""
+    # normalize_text rather than the .str regex methods: on Arrow-backed strings
+    # \s only matches ASCII whitespace, so NBSP etc. would no longer be collapsed
+    normalized = {field: df[field].map(normalize_text) for field in REQUIRED_FIELDS}
+    field_keys = 'fields'
+    for field in ['title', 'author', 'publication', 'url']:
+        field_keys = field_keys + '\x1f' + normalized[field]
+    doi_keys = 'doi\x1f' + normalized['doi']
+    return doi_keys.where(normalized['doi'] != '', field_keys)
+
+# Maximum number of CSV files parsed at once
+MAX_READ_WORKERS = 8
+
+def read_csv_file(file):
+    # Give Arrow the header names as pandas reads them ('Unnamed: 4', 'x.1', ...)
+    # so every column is typed as text and written back out unchanged
+    header = pd.read_csv(file, nrows=0)
+    table = pacsv.read_csv(
+        file,
+        read_options=pacsv.ReadOptions(use_threads=True, column_names=list(header.columns), skip_rows=1),
+        # Quoted values such as abstracts may span several lines
+        parse_options=pacsv.ParseOptions(newlines_in_values=True),
+        convert_options=pacsv.ConvertOptions(
+            column_types={col: pa.string() for col in header.columns},
+            strings_can_be_null=True
+        )
+    )
+    return normalize_columns(table.to_pandas())
+
+def read_bib_file(file):
+    with open(file, 'r', encoding='utf-8') as bibtex_file:
+        parser = BibTexParser(common_strings=True)
+        parser.customization = homogenize_latex_encoding
+        return bibtexparser.load(bibtex_file, parser=parser).entries
+
+def write_bibtex(entries, output_file):
+    """Write entries to a .bib file one at a time instead of as one big string"""
+    writer = BibTexWriter()
+    # Same order BibTexWriter.write() would use
+    entries = sorted(entries, key=lambda entry: BibDatabase.entry_sort_key(entry, writer.order_entries_by))
+    with open(output_file, 'w', encoding='utf-8') as bibfile:
+        for i, entry in enumerate(entries):
+            if i:
+                bibfile.write(writer.entry_separator)
+            bibfile.write(writer._entry_to_bibtex(entry))
+
+def hash_key(key):
+    # A 16-byte digest is much smaller to keep in a set than the tuple of strings
+    return hashlib.blake2b('\x1f'.join(key).encode('utf-8'), digest_size=16).digest()
+
+seen_keys = set()
+unique_entries = []
 duplicate_count = 0
 total_count = 0
 file_entry_counts = {}
 
 if csv_files:
-    for file in csv_files:
-        df = pd.read_csv(file)
-        df = normalize_columns(df)
+    # Files are independent, so parse them in parallel
+    with ThreadPoolExecutor(max_workers=min(MAX_READ_WORKERS, len(csv_files))) as executor:
+        frames = list(executor.map(read_csv_file, csv_files))
 
-        if 'title' and 'author' and 'publication' and 'doi' and 'url' not in df.columns:
+    for file, df in zip(csv_files, frames):
+        missing = set(REQUIRED_FIELDS) - set(df.columns)
+        if missing:
             print(f"❌ Error: CSV '{os.path.basename(file)}' must contain the following columns: {REQUIRED_FIELDS}")
             exit()
 
-        file_total = 0
-        for _, row in df.iterrows():
-            total_count += 1
-            file_total += 1
-            key = get_unique_key(row, use_only_doi=False)
-            if key not in unique_entries:
-                unique_entries[key] = row
-            else:
-                duplicate_count += 1
-        file_entry_counts[os.path.basename(file)] = file_total
+        file_entry_counts[os.path.basename(file)] = len(df)
+
+    combined_df = pd.concat(frames, ignore_index=True)
+    result_df = combined_df[~get_unique_keys(combined_df).duplicated(keep='first')]
+    total_count = len(combined_df)
+    unique_count = len(result_df)
+    duplicate_count = total_count - unique_count
 
-    result_df = pd.DataFrame(unique_entries.values())
     output_file = os.path.join(folder_path, "deduplicated_output.csv")
-    result_df.to_csv(output_file, index=False)
+    pacsv.write_csv(pa.Table.from_pandas(result_df, preserve_index=False), output_file)
     output_type = "CSV"
 
 else:
+    # bibtexparser holds the GIL, so files are parsed one at a time; each file's
+    # duplicate entries are freed as soon as it has been processed
     for file in bib_files:
-        with open(file, 'r', encoding='utf-8') as bibtex_file:
-            parser = BibTexParser(common_strings=True)
-            parser.customization = homogenize_latex_encoding
-            bib_database = bibtexparser.load(bibtex_file, parser=parser)
-
-            file_total = 0
-            for entry in bib_database.entries:
-                total_count += 1
-                file_total += 1
-                key = get_unique_key(entry, use_only_doi=False)
-                if key not in unique_entries:
-                    unique_entries[key] = entry
-                else:
-                    duplicate_count += 1
-            file_entry_counts[os.path.basename(file)] = file_total
+        file_total = 0
+        for entry in read_bib_file(file):
+            total_count += 1
+            file_total += 1
+            key = hash_key(get_unique_key(entry, use_only_doi=False))
+            if key not in seen_keys:
+                seen_keys.add(key)
+                unique_entries.append(entry)
+            else:
+                duplicate_count += 1
+        file_entry_counts[os.path.basename(file)] = file_total
 
+    unique_count = len(unique_entries)
     output_file = os.path.join(folder_path, "deduplicated_output.bib")
-    db = bibtexparser.bibdatabase.BibDatabase()
-    db.entries = list(unique_entries.values())
-    writer = bibtexparser.bwriter.BibTexWriter()
-    with open(output_file, 'w', encoding='utf-8') as bibfile:
-        bibfile.write(writer.write(db))
+    write_bibtex(unique_entries, output_file)
     output_type = "BibTeX"
 
 # Write summary
-summary_lines = [
-    f"📄 File Type: {output_type}",
-    f"📂 Folder: {folder_path}",
-    "\n📑 Citations per file:"
-]
+summary = io.StringIO()
+summary.write(f"📄 File Type: {output_type}\n")
+summary.write(f"📂 Folder: {folder_path}\n")
+summary.write("\n📑 Citations per file:\n")
 
 for fname, count in file_entry_counts.items():
-    summary_lines.append(f"   - {fname}: {count} citations")
+    summary.write(f"   - {fname}: {count} citations\n")
 
-summary_lines += [
-    f"\n📊 Total Bibliography Entries: {total_count}",
-    f"🔁 Duplicate Entries Removed: {duplicate_count}",
-    f"✅ Unique Entries Saved: {len(unique_entries)}",
-    f"📤 Output File: {os.path.basename(output_file)}"
-]
+summary.write(f"\n📊 Total Bibliography Entries: {total_count}\n")
+summary.write(f"🔁 Duplicate Entries Removed: {duplicate_count}\n")
+summary.write(f"✅ Unique Entries Saved: {unique_count}\n")
+summary.write(f"📤 Output File: {os.path.basename(output_file)}")
 
-summary = "\n".join(summary_lines)
+summary_text = summary.getvalue()
 summary_file = os.path.join(folder_path, "deduplication_summary.txt")
 with open(summary_file, "w", encoding="utf-8") as f:
-    f.write(summary)
+    f.write(summary_text)
 
-print(summary)
+print(summary_text)
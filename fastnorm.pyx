@@ -0,0 +1,26 @@
+# cython: language_level=3
+"""Compiled versions of the deduplication key helpers in deduplication.py.
+
+Built on first import through pyximport when Cython is installed;
+deduplication.py falls back to its pure-Python versions otherwise.
+"""
+
+
+cpdef str normalize_text(str text):
+    # str.split() drops leading/trailing whitespace and splits on the same
+    # characters as the \s+ pattern used by the pure-Python version
+    return ' '.join(text.casefold().split())
+
+
+cpdef tuple make_key(str title, str author, str publication, str doi, str url):
+    cdef str normalized_doi = normalize_text(doi)
+    # A DOI identifies the work on its own, so skip the other fields
+    if normalized_doi:
+        return ('doi', normalized_doi)
+    return (
+        'fields',
+        normalize_text(title),
+        normalize_text(author),
+        normalize_text(publication),
+        normalize_text(url)
+    )
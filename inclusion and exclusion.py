@@ -1,15 +1,25 @@
+import io
 import os
 import pandas as pd
 import bibtexparser
-from bibtexparser.bparser import BibTexParser
+from bibtexparser.bparser import BibTexParser, STANDARD_TYPES
+from bibtexparser.bibdatabase import BibDatabase
+from bibtexparser.bwriter import BibTexWriter
 from bibtexparser.customization import homogenize_latex_encoding
 from tkinter import Tk, filedialog
 import re
 from datetime import datetime
-import requests
+import asyncio
+import atexit
+import json
 import time
+import httpx
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
 from urllib.parse import urlparse
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 
 # Disable root Tk window
 Tk().withdraw()
@@ -30,8 +40,8 @@ start_year = int(start_year_input)
 current_year = datetime.now().year
 
 # Get files
-all_files = [os.path.join(folder_path, f) for f in os.listdir(folder_path) if
-             os.path.isfile(os.path.join(folder_path, f))]
+with os.scandir(folder_path) as it:
+    all_files = [entry.path for entry in it if entry.is_file()]
 
 # Determine file type
 csv_files = [f for f in all_files if f.lower().endswith(".csv")]
@@ -46,43 +56,385 @@ elif not csv_files and not bib_files:
     exit()
 
 
-def get_publication_type(doi):
-    """Fetch publication type from Crossref API using DOI"""
-    if not doi or pd.isna(doi):
-        return "Unknown"
+CROSSREF_API = "https://api.crossref.org/works"
+
+# Crossref serves clients that identify themselves with a contact address from
+# its "polite" pool, which has higher rate limits than anonymous traffic.
+CROSSREF_MAILTO = os.environ.get("CROSSREF_MAILTO", "").strip()
+if CROSSREF_MAILTO:
+    CROSSREF_CONTACT = f"https://github.com/tahsinnahmed/SLR-Automation; mailto:{CROSSREF_MAILTO}"
+else:
+    CROSSREF_CONTACT = "https://github.com/tahsinnahmed/SLR-Automation"
+    print("⚠️ CROSSREF_MAILTO is not set; Crossref lookups will use the slower public pool.")
+CROSSREF_HEADERS = {
+    'User-Agent': f"SLR-Automation/1.0 ({CROSSREF_CONTACT})"
+}
+
+# Maximum number of Crossref requests in flight at once
+MAX_CONCURRENT_REQUESTS = 8
+
+# Number of DOIs resolved by a single Crossref filter query
+CROSSREF_BATCH_SIZE = 40
+
+# Crossref responses worth retrying, how often, and the base delay between attempts
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+MAX_RETRIES = 3
+RETRY_BACKOFF = 0.3
+
+# Cached DOI lookups older than this are fetched again
+CACHE_MAX_AGE_DAYS = 90
+cache_file = os.path.join(folder_path, ".crossref_cache.json")
+
+
+def load_doi_cache(path):
+    """Load cached DOI -> publication type lookups, dropping stale entries"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+    cutoff = time.time() - CACHE_MAX_AGE_DAYS * 24 * 60 * 60
+    return {doi: record for doi, record in cached.items() if record.get('fetched', 0) >= cutoff}
+
+
+def save_doi_cache():
+    """Persist the DOI cache so later runs can skip Crossref"""
+    if not doi_cache:
+        return
+    try:
+        with open(cache_file, 'w', encoding='utf-8') as f:
+            json.dump(doi_cache, f)
+    except OSError:
+        print(f"⚠️ Could not write DOI cache: {cache_file}")
 
-    # Clean DOI (remove URL parts if present)
+
+doi_cache = load_doi_cache(cache_file)
+atexit.register(save_doi_cache)
+
+
+def clean_doi(doi):
+    """Clean DOI (remove URL parts if present)"""
+    # Drop all whitespace, including line breaks wrapped into long BibTeX fields
+    doi = ''.join(str(doi).split())
     if doi.startswith(('http://', 'https://')):
         parsed = urlparse(doi)
         doi = parsed.path.lstrip('/')
+    # DOIs are case-insensitive
+    return doi.lower()
+
+
+def classify_crossref_type(pub_type):
+    """Map Crossref types to our categories"""
+    pub_type = pub_type.lower()
+    if pub_type in ['journal-article', 'article']:
+        return "Original Research"
+    elif pub_type in ['proceedings-article', 'conference-paper', 'conference']:
+        return "Conference Paper"
+    else:
+        return "Other"
+
+
+def get_retry_delay(response, attempt):
+    """Seconds to wait before retrying a failed Crossref request"""
+    retry_after = response.headers.get('Retry-After', '')
+    if retry_after.isdigit():
+        return int(retry_after)
+
+    # When rate limited, wait out the window Crossref advertises (e.g. "1s")
+    interval = response.headers.get('X-Rate-Limit-Interval', '').rstrip('s')
+    if response.status_code == 429 and interval.isdigit():
+        return int(interval)
+
+    return RETRY_BACKOFF * 2 ** attempt
+
+
+async def get_crossref_message(client, url, params=None):
+    """GET a Crossref endpoint, retrying timeouts, rate-limit and server errors with backoff"""
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            response = await client.get(url, params=params)
+        except httpx.TimeoutException:
+            if attempt == MAX_RETRIES:
+                raise
+            await asyncio.sleep(RETRY_BACKOFF * 2 ** attempt)
+            continue
+        if response.status_code not in RETRY_STATUSES or attempt == MAX_RETRIES:
+            break
+        await asyncio.sleep(get_retry_delay(response, attempt))
+    response.raise_for_status()
+    return response.json()['message']
 
-    try:
-        url = f"https://api.crossref.org/works/{doi}"
-        response = requests.get(url, headers={'User-Agent': 'Mozilla/5.0'})
-        response.raise_for_status()
-        data = response.json()
-
-        # Get publication type and normalize it
-        pub_type = data['message'].get('type', 'unknown').lower()
-
-        # Map Crossref types to our categories
-        if pub_type in ['journal-article', 'article']:
-            return "Original Research"
-        elif pub_type in ['proceedings-article', 'conference-paper', 'conference']:
-            return "Conference Paper"
-        else:
-            return "Other"
 
-    except requests.exceptions.RequestException:
-        return "Unknown"
-    except (KeyError, ValueError):
-        return "Unknown"
+async def fetch_publication_type(doi, semaphore, client):
+    """Fetch publication type from Crossref API using DOI"""
+    async with semaphore:
+        try:
+            message = await get_crossref_message(client, f"{CROSSREF_API}/{doi}")
+
+            # Get publication type and normalize it
+            return {doi: classify_crossref_type(message.get('type', 'unknown'))}
+
+        # InvalidURL isn't an HTTPError; it is raised for DOIs that can't form a URL
+        except (httpx.HTTPError, httpx.InvalidURL):
+            return {doi: "Unknown"}
+        except (KeyError, ValueError):
+            return {doi: "Unknown"}
+
+
+async def fetch_publication_type_batch(dois, semaphore, client):
+    """Fetch publication types for several DOIs with a single Crossref filter query"""
+    params = {
+        'filter': ','.join(f"doi:{doi}" for doi in dois),
+        'rows': len(dois),
+        'select': 'DOI,type'
+    }
+    async with semaphore:
+        try:
+            message = await get_crossref_message(client, CROSSREF_API, params)
+            items = message['items']
+        except (httpx.HTTPError, httpx.InvalidURL):
+            items = None
+        except (KeyError, ValueError):
+            items = None
+
+    if items is None:
+        # One malformed DOI or a failed request shouldn't cost the whole batch,
+        # so look its DOIs up one at a time instead
+        results = await asyncio.gather(*[fetch_publication_type(doi, semaphore, client) for doi in dois])
+        pub_types = {}
+        for result in results:
+            pub_types.update(result)
+        return pub_types
+
+    # DOIs that Crossref doesn't return stay Unknown
+    pub_types = dict.fromkeys(dois, "Unknown")
+    for item in items:
+        doi = str(item.get('DOI', '')).lower()
+        if doi in pub_types:
+            pub_types[doi] = classify_crossref_type(item.get('type', 'unknown'))
+    return pub_types
+
+
+async def fetch_publication_types(dois):
+    """Fetch publication types for a list of cleaned DOIs"""
+    # Commas separate filters, so DOIs containing one are looked up on their own
+    batchable = [doi for doi in dois if ',' not in doi]
+    batches = [batchable[i:i + CROSSREF_BATCH_SIZE] for i in range(0, len(batchable), CROSSREF_BATCH_SIZE)]
+
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    # Keep one pooled connection per concurrent request alive, and retry failed connects
+    transport = httpx.AsyncHTTPTransport(
+        retries=MAX_RETRIES,
+        limits=httpx.Limits(
+            max_connections=MAX_CONCURRENT_REQUESTS,
+            max_keepalive_connections=MAX_CONCURRENT_REQUESTS
+        )
+    )
+    async with httpx.AsyncClient(headers=CROSSREF_HEADERS, timeout=30, transport=transport) as client:
+        results = await asyncio.gather(
+            *[fetch_publication_type_batch(batch, semaphore, client) for batch in batches],
+            *[fetch_publication_type(doi, semaphore, client) for doi in dois if ',' in doi]
+        )
+
+    pub_types = {}
+    for result in results:
+        pub_types.update(result)
+    return pub_types
+
+
+def get_publication_types(dois):
+    """Look up publication types for many DOIs concurrently, keyed by cleaned DOI"""
+    unique_dois = list(dict.fromkeys(clean_doi(doi) for doi in dois if pd.notna(doi) and doi))
+    unique_dois = [doi for doi in unique_dois if doi]
+
+    pub_types = {doi: doi_cache[doi]['type'] for doi in unique_dois if doi in doi_cache}
+    missing = [doi for doi in unique_dois if doi not in pub_types]
+    if missing:
+        fetched = asyncio.run(fetch_publication_types(missing))
+        now = time.time()
+        for doi, pub_type in fetched.items():
+            # Failed lookups are retried on the next run
+            if pub_type != "Unknown":
+                doi_cache[doi] = {'type': pub_type, 'fetched': now}
+        pub_types.update(fetched)
+    return pub_types
+
+
+# Only these publication types make it into the output
+INCLUDED_TYPES = ['Original Research', 'Conference Paper']
+
+# Local type column values that identify a publication type without Crossref
+JOURNAL_PATTERN = r'journal|article'
+CONFERENCE_PATTERN = r'conference|proceeding'
+
+# BibTeX entry types that identify a publication type without Crossref
+# (@proceedings is a whole volume, not a paper, so it is left to Crossref)
+BIB_ENTRY_TYPES = {
+    'article': "Original Research",
+    'inproceedings': "Conference Paper",
+    'conference': "Conference Paper"
+}
+
+
+def classify_local(type_values):
+    """Classify rows from an exported type column; "Unknown" where it isn't conclusive"""
+    type_str = type_values.astype('string')
+    pub_types = pd.Series("Unknown", index=type_values.index, dtype=object)
+    pub_types[type_str.str.contains(CONFERENCE_PATTERN, case=False, na=False)] = "Conference Paper"
+    pub_types[type_str.str.contains(JOURNAL_PATTERN, case=False, na=False)] = "Original Research"
+    return pub_types
+
+
+# Maximum number of CSV files parsed at once
+MAX_READ_WORKERS = 8
+
+# Bytes of CSV parsed at a time
+CSV_BLOCK_SIZE = 16 * 1024 * 1024
 
 
 def normalize_columns(df):
     return {col.lower().strip().replace(" ", ""): col for col in df.columns}
 
 
+# Year filter bounds and helpers, built once for all CSV blocks
+NUMERIC_YEAR = r'^\d+(\.\d*)?$'
+NULL_YEAR = pa.scalar(None, pa.string())
+START_YEAR = pa.scalar(start_year, pa.float64())
+END_YEAR = pa.scalar(current_year, pa.float64())
+
+
+def year_in_range(years):
+    """Mask of a text year column whose values fall inside the filter range"""
+    years = pc.utf8_trim_whitespace(years)
+    # Non-numeric years become null and are dropped by the filter
+    numeric = pc.match_substring_regex(years, NUMERIC_YEAR)
+    years = pc.cast(pc.if_else(numeric, years, NULL_YEAR), pa.float64())
+    return pc.and_(pc.greater_equal(years, START_YEAR), pc.less_equal(years, END_YEAR))
+
+
+# Start of each BibTeX block, its entry type, and its year field. Blocks are split at
+# every "@type{" rather than only at line starts, because some exports (e.g. IEEE
+# Xplore) run entries together on one line: "month={Nov},}@INPROCEEDINGS{..."
+BIB_BLOCK_START = re.compile(r'(?=@\s*\w+\s*[{(])')
+BIB_ENTRY_TYPE = re.compile(r'\s*@\s*(\w+)')
+BIB_YEAR = re.compile(r'^\s*year\s*=\s*[{"]?\s*(\d{4})\b', re.I | re.M)
+
+
+def prefilter_bibtex(text):
+    """Drop entries whose year is outside the range before the (slow) full parse.
+
+    Returns the remaining BibTeX text and the number of entries dropped.
+    Entries without exactly one recognizable year are left for the parser to judge.
+    """
+    kept_blocks = []
+    skipped = 0
+    for block in BIB_BLOCK_START.split(text):
+        entry_type = BIB_ENTRY_TYPE.match(block)
+        years = BIB_YEAR.findall(block)
+        if (entry_type and entry_type.group(1).lower() in STANDARD_TYPES and len(years) == 1
+                and not start_year <= int(years[0]) <= current_year):
+            skipped += 1
+        else:
+            kept_blocks.append(block)
+    return ''.join(kept_blocks), skipped
+
+
+def read_csv_in_range(file):
+    """Read a CSV file, keeping only the rows inside the year range.
+
+    Returns (year_filtered, total_refs, doi_col, type_col) with year_filtered
+    as an Arrow table, or None if the file has no year column.
+    """
+    # Read only the header first to locate the relevant columns
+    header = pd.read_csv(file, nrows=0)
+    columns = normalize_columns(header)
+
+    # Find relevant columns
+    year_col = None
+    doi_col = None
+    type_col = None
+
+    for key in columns:
+        if 'year' in key:
+            year_col = columns[key]
+        elif 'doi' in key:
+            doi_col = columns[key]
+        elif 'type' in key or 'publicationtype' in key:
+            type_col = columns[key]
+
+    if not year_col:
+        return None
+
+    # Stream the file in blocks with Arrow's multithreaded reader, keeping only the
+    # rows inside the year range, so large exports are never held in memory in full.
+    # Every column is read as text so later blocks can't clash with types guessed
+    # from the first one; Arrow is given the header names as pandas reads them
+    # ('Unnamed: 4', 'x.1', ...) so that column_types covers every column.
+    reader = pacsv.open_csv(
+        file,
+        read_options=pacsv.ReadOptions(
+            use_threads=True,
+            block_size=CSV_BLOCK_SIZE,
+            column_names=list(header.columns),
+            skip_rows=1
+        ),
+        # Quoted values such as abstracts may span several lines
+        parse_options=pacsv.ParseOptions(newlines_in_values=True),
+        convert_options=pacsv.ConvertOptions(
+            column_types={col: pa.string() for col in header.columns},
+            strings_can_be_null=True
+        )
+    )
+    total_refs = 0
+    year_batches = []
+    for batch in reader:
+        total_refs += batch.num_rows
+        year_batches.append(batch.filter(year_in_range(batch.column(year_col))))
+    year_filtered = pa.Table.from_batches(year_batches, schema=reader.schema)
+    return year_filtered, total_refs, doi_col, type_col
+
+
+def read_bib_in_range(file):
+    """Parse a BibTeX file, keeping only the entries inside the year range.
+
+    Returns (year_filtered, total_refs).
+    """
+    with open(file, 'r', encoding='utf-8') as bibtex_file:
+        bibtex_text, skipped_refs = prefilter_bibtex(bibtex_file.read())
+
+    # LaTeX encoding is homogenized only for the entries that end up included;
+    # running it on every field of every entry is slow and would also escape
+    # characters in the DOIs sent to Crossref (e.g. '_' -> '\_')
+    parser = BibTexParser(common_strings=True)
+    bib_database = bibtexparser.loads(bibtex_text, parser=parser)
+
+    entries = bib_database.entries
+    total_refs = len(entries) + skipped_refs
+
+    year_filtered = []
+    for entry in entries:
+        try:
+            year = int(entry.get('year', '').strip())
+        except ValueError:
+            continue
+        if start_year <= year <= current_year:
+            year_filtered.append(entry)
+    return year_filtered, total_refs
+
+
+def write_bibtex(entries, output_file):
+    """Write entries to a .bib file one at a time instead of as one big string"""
+    writer = BibTexWriter()
+    # Same order BibTexWriter.write() would use
+    entries = sorted(entries, key=lambda entry: BibDatabase.entry_sort_key(entry, writer.order_entries_by))
+    with open(output_file, 'w', encoding='utf-8') as bibfile:
+        for i, entry in enumerate(entries):
+            if i:
+                bibfile.write(writer.entry_separator)
+            bibfile.write(writer._entry_to_bibtex(entry))
+
+
 filtered_entries = []
 file_stats = {}
 total_found = 0
@@ -90,60 +442,40 @@ total_filtered = 0
 publication_types = defaultdict(int)
 
 if csv_files:
-    for file in csv_files:
-        df = pd.read_csv(file)
-        columns = normalize_columns(df)
-
-        # Find relevant columns
-        year_col = None
-        doi_col = None
-        type_col = None
-
-        for key in columns:
-            if 'year' in key:
-                year_col = columns[key]
-            elif 'doi' in key:
-                doi_col = columns[key]
-            elif 'type' in key or 'publicationtype' in key:
-                type_col = columns[key]
-
-        if not year_col:
+    # Files are independent, so parse them in parallel
+    with ThreadPoolExecutor(max_workers=min(MAX_READ_WORKERS, len(csv_files))) as executor:
+        csv_results = list(executor.map(read_csv_in_range, csv_files))
+
+    for file, result in zip(csv_files, csv_results):
+        if result is None:
             print(f"❌ No 'year' column found in {file}")
             continue
+        year_filtered, total_refs, doi_col, type_col = result
 
-        df[year_col] = pd.to_numeric(df[year_col], errors='coerce')
-
-        total_refs = len(df)
-        # First filter by year
-        year_filtered = df[(df[year_col] >= start_year) & (df[year_col] <= current_year)].copy()
-
-        final_filtered = []
-        for _, row in year_filtered.iterrows():
-            pub_type = "Unknown"
-
-            # First try to get type from DOI
-            if doi_col and pd.notna(row[doi_col]):
-                pub_type = get_publication_type(row[doi_col])
-                time.sleep(0.5)  # Be polite to API
+        # Only the DOI and type columns are needed in pandas; the full rows stay in Arrow
+        lookup_df = year_filtered.select([col for col in (doi_col, type_col) if col]).to_pandas()
 
-            # If still unknown, try to get from type column
-            if pub_type == "Unknown" and type_col and pd.notna(row[type_col]):
-                type_str = str(row[type_col]).lower()
-                if 'journal' in type_str or 'article' in type_str:
-                    pub_type = "Original Research"
-                elif 'conference' in type_str or 'proceeding' in type_str:
-                    pub_type = "Conference Paper"
+        # Classify from the type column first, so only unresolved rows need Crossref
+        if type_col:
+            pub_types = classify_local(lookup_df[type_col])
+        else:
+            pub_types = pd.Series("Unknown", index=lookup_df.index, dtype=object)
 
-            publication_types[pub_type] += 1
+        if doi_col:
+            # Resolve the remaining DOIs of this file in one concurrent batch
+            needs_lookup = (pub_types == "Unknown") & lookup_df[doi_col].notna()
+            dois = lookup_df.loc[needs_lookup, doi_col].map(clean_doi)
+            doi_types = get_publication_types(dois)
+            pub_types[needs_lookup] = dois.map(doi_types).fillna("Unknown")
 
-            if pub_type in ['Original Research', 'Conference Paper']:
-                final_filtered.append(row)
+        for pub_type, count in pub_types.value_counts().items():
+            publication_types[pub_type] += int(count)
 
-        filtered_refs = len(final_filtered)
+        filtered_table = year_filtered.filter(pa.array(pub_types.isin(INCLUDED_TYPES).to_numpy()))
+        filtered_refs = filtered_table.num_rows
 
         if filtered_refs > 0:
-            filtered_df = pd.DataFrame(final_filtered)
-            filtered_entries.append(filtered_df)
+            filtered_entries.append(filtered_table)
             file_stats[os.path.basename(file)] = {
                 'total': total_refs,
                 'filtered': filtered_refs,
@@ -153,103 +485,98 @@ if csv_files:
             total_filtered += filtered_refs
 
     if filtered_entries:
-        result_df = pd.concat(filtered_entries, ignore_index=True)
-        output_file = os.path.join(folder_path, f"Included File.csv")
-        result_df.to_csv(output_file, index=False)
+        # Files may have different columns; missing ones are filled with nulls
+        result_table = pa.concat_tables(filtered_entries, promote_options="default")
+        output_file = os.path.join(folder_path, "Included File.csv")
+        pacsv.write_csv(result_table, output_file)
         output_type = "CSV"
     else:
         print("⚠️ No references matched your filters.")
         exit()
 
 else:  # BibTeX files
+    # bibtexparser holds the GIL, so unlike CSVs the files are parsed one at a time
     for file in bib_files:
-        with open(file, 'r', encoding='utf-8') as bibtex_file:
-            parser = BibTexParser(common_strings=True)
-            parser.customization = homogenize_latex_encoding
-            bib_database = bibtexparser.load(bibtex_file, parser=parser)
-
-            entries = bib_database.entries
-            total_refs = len(entries)
-
-            filtered = []
-            for entry in entries:
-                try:
-                    year = int(entry.get('year', '').strip())
-                    if start_year <= year <= current_year:
-                        # Get publication type if DOI exists
-                        doi = entry.get('doi', '')
-                        if doi:
-                            pub_type = get_publication_type(doi)
-                            publication_types[pub_type] += 1
-
-                            # Only include if it's Original Research or Conference Paper
-                            if pub_type in ['Original Research', 'Conference Paper']:
-                                entry['publication_type'] = pub_type
-                                filtered.append(entry)
-
-                            time.sleep(0.5)
-                        else:
-                            # If no DOI, we can't determine type, so exclude it
-                            publication_types['No DOI'] += 1
-                except ValueError:
+        year_filtered, total_refs = read_bib_in_range(file)
+
+        # Classify from the entry type first, so only unresolved entries need Crossref
+        local_types = [BIB_ENTRY_TYPES.get(entry.get('ENTRYTYPE', '').lower(), "Unknown") for entry in year_filtered]
+
+        # Resolve the remaining DOIs of this file in one concurrent batch
+        doi_types = get_publication_types(
+            entry.get('doi', '') for entry, local_type in zip(year_filtered, local_types) if local_type == "Unknown"
+        )
+
+        filtered = []
+        for entry, pub_type in zip(year_filtered, local_types):
+            if pub_type == "Unknown":
+                # Get publication type if DOI exists
+                doi = entry.get('doi', '')
+                if not doi:
+                    # If no DOI, we can't determine type, so exclude it
+                    publication_types['No DOI'] += 1
                     continue
+                pub_type = doi_types.get(clean_doi(doi), "Unknown")
+
+            publication_types[pub_type] += 1
 
-            filtered_refs = len(filtered)
+            # Only include if it's Original Research or Conference Paper
+            if pub_type in INCLUDED_TYPES:
+                entry = homogenize_latex_encoding(entry)
+                entry['publication_type'] = pub_type
+                filtered.append(entry)
 
-            if filtered_refs > 0:
-                filtered_entries.extend(filtered)
-                file_stats[os.path.basename(file)] = {
-                    'total': total_refs,
-                    'filtered': filtered_refs,
-                    'ignored': total_refs - filtered_refs
-                }
-                total_found += total_refs
-                total_filtered += filtered_refs
+        filtered_refs = len(filtered)
+
+        if filtered_refs > 0:
+            filtered_entries.extend(filtered)
+            file_stats[os.path.basename(file)] = {
+                'total': total_refs,
+                'filtered': filtered_refs,
+                'ignored': total_refs - filtered_refs
+            }
+            total_found += total_refs
+            total_filtered += filtered_refs
 
     if filtered_entries:
-        output_file = os.path.join(folder_path, f"Included File.bib")
-        db = bibtexparser.bibdatabase.BibDatabase()
-        db.entries = filtered_entries
-        writer = bibtexparser.bwriter.BibTexWriter()
-        with open(output_file, 'w', encoding='utf-8') as bibfile:
-            bibfile.write(writer.write(db))
+        output_file = os.path.join(folder_path, "Included File.bib")
+        write_bibtex(filtered_entries, output_file)
         output_type = "BibTeX"
     else:
         print("⚠️ No references matched your filters.")
         exit()
 
 # Generate Summary
-summary_lines = [
-    f"📄 File Type: {output_type}",
-    f"📂 Folder: {folder_path}",
-    f"📅 Filtering from {start_year} to {current_year}",
-    f"🔍 Included only: Original Research and Conference Papers\n",
-    "📑 File-wise Reference Count:"
-]
+summary = io.StringIO()
+summary.write(f"📄 File Type: {output_type}\n")
+summary.write(f"📂 Folder: {folder_path}\n")
+summary.write(f"📅 Filtering from {start_year} to {current_year}\n")
+summary.write("🔍 Included only: Original Research and Conference Papers\n\n")
+summary.write("📑 File-wise Reference Count:\n")
 
 for fname, stats in file_stats.items():
-    summary_lines.append(f"   - {fname}:")
-    summary_lines.append(f"       Total References:   {stats['total']}")
-    summary_lines.append(f"       Matched (Filtered): {stats['filtered']}")
-    summary_lines.append(f"       Ignored (Too Old/Wrong Type):  {stats['ignored']}")
+    summary.write(f"   - {fname}:\n")
+    summary.write(f"       Total References:   {stats['total']}\n")
+    summary.write(f"       Matched (Filtered): {stats['filtered']}\n")
+    summary.write(f"       Ignored (Too Old/Wrong Type):  {stats['ignored']}\n")
 
-summary_lines.append(f"\n📊 Total References Found:    {total_found}")
-summary_lines.append(f"✅ Total References Included: {total_filtered}")
-summary_lines.append(f"❌ Total References Excluded: {total_found - total_filtered}")
+summary.write(f"\n📊 Total References Found:    {total_found}\n")
+summary.write(f"✅ Total References Included: {total_filtered}\n")
+summary.write(f"❌ Total References Excluded: {total_found - total_filtered}\n")
 
 # Add publication type statistics (showing what was excluded)
-summary_lines.append("\n📝 Publication Type Breakdown (Before Final Filtering):")
+summary.write("\n📝 Publication Type Breakdown (Before Final Filtering):\n")
 for pub_type, count in sorted(publication_types.items(), key=lambda x: x[1], reverse=True):
-    if pub_type in ['Original Research', 'Conference Paper']:
-        summary_lines.append(f"   - {pub_type}: {count} ✅ INCLUDED")
+    if pub_type in INCLUDED_TYPES:
+        summary.write(f"   - {pub_type}: {count} ✅ INCLUDED\n")
     else:
-        summary_lines.append(f"   - {pub_type}: {count} ❌ EXCLUDED")
+        summary.write(f"   - {pub_type}: {count} ❌ EXCLUDED\n")
 
-summary_lines.append(f"\n📤 Output File: {os.path.basename(output_file)}")
+summary.write(f"\n📤 Output File: {os.path.basename(output_file)}")
 
-summary = "\n".join(summary_lines)
-summary_file = os.path.join(folder_path, f"Inclusion Summary.txt")
+summary_text = summary.getvalue()
+summary_file = os.path.join(folder_path, "Inclusion Summary.txt")
 with open(summary_file, "w", encoding="utf-8") as f:
-    f.write(summary)
+    f.write(summary_text)
 
-print(summary)
\ No newline at end of file
+print(summary_text)
\ No newline at end of file